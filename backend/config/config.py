@@ -1,31 +1,45 @@
 #!/usr/bin/env python3
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 import openai
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Mapping, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# API credentials are read from the environment once, after .env is loaded
+OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+OPENROUTER_API_KEY: Optional[str] = os.getenv("OPENROUTER_API_KEY")
+AZURE_SPEECH_KEY: Optional[str] = os.getenv("AZURE_SPEECH_KEY")
+AZURE_SPEECH_REGION: Optional[str] = os.getenv("AZURE_SPEECH_REGION")
+
+# API key for each supported chat host, keyed by the normalized API_HOST
+_CHAT_API_KEYS: Dict[str, Optional[str]] = {
+    "openai": OPENAI_API_KEY,
+    "openrouter": OPENROUTER_API_KEY,
+}
+
+@lru_cache(maxsize=1)
 def setup_chat_client():
-    """Initialize and return the appropriate chat client based on configuration."""
-    api_host = CONFIG["API_SETTINGS"]["API_HOST"].lower()
-    if api_host == "openai":
-        client = openai.AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY"),
-            base_url=CONFIG["API_SERVICES"]["openai"]["BASE_URL"]
-        )
-        deployment_name = CONFIG["API_SERVICES"]["openai"]["MODEL"]
-    elif api_host == "openrouter":
-        client = openai.AsyncOpenAI(
-            api_key=os.getenv("OPENROUTER_API_KEY"),
-            base_url=CONFIG["API_SERVICES"]["openrouter"]["BASE_URL"]
-        )
-        deployment_name = CONFIG["API_SERVICES"]["openrouter"]["MODEL"]
-    else:
+    """
+    Initialize and return the appropriate chat client based on configuration.
+
+    The client is built once and reused. API_HOST is part of the frozen
+    CONFIG, so the cached client never goes stale.
+    """
+    api_host = CONFIG["API_SETTINGS"]["API_HOST"]
+    if api_host not in _CHAT_API_KEYS:
         raise ValueError(f"Unsupported API_HOST: {api_host}")
-    return client, deployment_name
+    service = CONFIG["API_SERVICES"][api_host]
+    client = openai.AsyncOpenAI(
+        api_key=_CHAT_API_KEYS[api_host],
+        base_url=service["BASE_URL"]
+    )
+    return client, service["MODEL"]
 
-CONFIG: Dict[str, Any] = {
+_RAW_CONFIG: Dict[str, Any] = {
     "API_SETTINGS": {
         "API_HOST": "openai"
     },
@@ -51,6 +65,9 @@ CONFIG: Dict[str, Any] = {
         "USE_SEGMENTATION": True,
         "DELIMITERS": ["\n", ". ", "? ", "! ", "* "],
         "CHARACTER_MAXIMUM": 50,  # will only segment for the initial characters listed here, the rest will just stream
+        "CONTENT_FLUSH_INTERVAL_MS": 15,  # streamed text is coalesced for up to this long per websocket message
+        "CONTENT_FLUSH_CHARS": 512,  # or until this many characters are pending
+        "AUDIO_QUEUE_MAXSIZE": 32,  # framed TTS audio chunks buffered per connection before TTS waits on the client
     },
     "TTS_MODELS": {
         "PROVIDER": "azure",  # "azure" or "openai"
@@ -117,3 +134,38 @@ CONFIG: Dict[str, Any] = {
         "PRINT_FUNCTION_CALLS": True,
     },
 }
+
+@dataclass(slots=True)
+class AudioConfig:
+    """Runtime audio flags, toggled by the API and checked on every TTS turn."""
+    tts_enabled: bool
+    auto_send_enabled: bool
+
+# Live GENERAL_AUDIO state; CONFIG["GENERAL_AUDIO"] only holds the startup defaults
+AUDIO_CFG = AudioConfig(
+    tts_enabled=_RAW_CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"],
+    auto_send_enabled=_RAW_CONFIG["GENERAL_AUDIO"].get("AUTO_SEND_ENABLED", False),
+)
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# Normalize case-insensitive settings once, before freezing
+_RAW_CONFIG["API_SETTINGS"]["API_HOST"] = _RAW_CONFIG["API_SETTINGS"]["API_HOST"].lower()
+
+# Runtime toggles live in AUDIO_CFG, so everything left in CONFIG is static
+CONFIG: Mapping[str, Any] = _freeze(_RAW_CONFIG)
+
+# Derived constants resolved once for hot paths
+TTS_PROVIDER: str = CONFIG["TTS_MODELS"]["PROVIDER"].lower()
+
+# Websocket wire format: JSON control/content messages go out as text frames;
+# every binary frame is one type byte followed by its payload. 0x01 marks an
+# audio frame (raw PCM follows) and a bare 0x01 marks end of audio. TTS
+# producers emit frames already tagged so the forwarder never re-copies them.
+AUDIO_MESSAGE_PREFIX: bytes = b'\x01'
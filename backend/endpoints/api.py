@@ -1,10 +1,24 @@
 import logging
+import orjson
 from fastapi import APIRouter, HTTPException, Response
-from backend.config.config import CONFIG
-from backend.endpoints.state import GEN_STOP_EVENT, TTS_STOP_EVENT
+from fastapi.responses import ORJSONResponse
+from backend.config.config import AUDIO_CFG
+from backend.endpoints.state import stop_active_turns
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api")
+router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
+
+# Constant response bodies are serialized once at import. A fresh Response
+# is still built per request, because middleware mutates response headers
+# in place and a shared instance would accumulate them.
+_JSON = "application/json"
+_TTS_STOPPED_BODY = orjson.dumps({"status": "success", "message": "TTS stopped"})
+_GEN_STOPPED_BODY = orjson.dumps(
+    {"detail": "Generation stop event triggered. Ongoing text generation will exit soon."}
+)
+_TTS_TOGGLED_BODIES = {
+    enabled: orjson.dumps({"tts_enabled": enabled}) for enabled in (True, False)
+}
 
 @router.options("/options")
 async def openai_options():
@@ -13,9 +27,9 @@ async def openai_options():
 @router.post("/toggle-tts")
 async def toggle_tts():
     try:
-        current_status = CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"]
-        CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"] = not current_status
-        return {"tts_enabled": CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"]}
+        tts_enabled = not AUDIO_CFG.tts_enabled
+        AUDIO_CFG.tts_enabled = tts_enabled
+        return Response(_TTS_TOGGLED_BODIES[tts_enabled], media_type=_JSON)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to toggle TTS: {str(e)}")
 
@@ -26,24 +40,35 @@ async def get_config():
     """
     try:
         return {
-            "tts_enabled": CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"],
-            "auto_send_enabled": CONFIG["GENERAL_AUDIO"].get("AUTO_SEND_ENABLED", False)
+            "tts_enabled": AUDIO_CFG.tts_enabled,
+            "auto_send_enabled": AUDIO_CFG.auto_send_enabled
         }
     except Exception as e:
-        logger.error(f"Error getting config: {e}")
+        logger.error("Error getting config: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get config: {str(e)}")
 
 @router.post("/stop-audio")
 async def stop_tts():
+    """
+    Stop the audio of every chat turn in flight.
+    A turn's stop event also ends its TTS, so this sets the same events as
+    /stop-generation; text still being generated for those turns stops too.
+    """
     logger.info("Stop TTS requested")
-    TTS_STOP_EVENT.set()
-    return {"status": "success", "message": "TTS stopped"}
+    stop_active_turns()
+    return Response(_TTS_STOPPED_BODY, media_type=_JSON)
 
 @router.post("/stop-generation")
 async def stop_generation():
     """
-    Manually set the global GEN_STOP_EVENT.
-    Any ongoing streaming text generation will stop soon after it checks the event.
+    Set the stop event of every chat turn in flight.
+    Their text generation and audio will stop soon after they check it.
     """
-    GEN_STOP_EVENT.set()
-    return {"detail": "Generation stop event triggered. Ongoing text generation will exit soon."}
+    stop_active_turns()
+    return Response(_GEN_STOPPED_BODY, media_type=_JSON)
+
+# Starlette matches routes in registration order, so a second route with the same
+# path and methods would never be reached; checked at import, even under python -O
+_route_keys = [(route.path, frozenset(getattr(route, "methods", None) or ())) for route in router.routes]
+if len(set(_route_keys)) != len(_route_keys):
+    raise RuntimeError("Duplicate /api route (path, methods) registration")
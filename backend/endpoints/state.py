@@ -1,4 +1,11 @@
 # backend/endpoints/state.py
 import asyncio
-TTS_STOP_EVENT = asyncio.Event()
-GEN_STOP_EVENT = asyncio.Event()
\ No newline at end of file
+
+# Stop events of the chat turns whose text or audio is still in flight. Each
+# turn owns its event, so a stop never carries over into a later turn. The
+# stop endpoints have no connection identity, so they stop every turn listed here.
+ACTIVE_TURN_STOPS: set[asyncio.Event] = set()
+
+def stop_active_turns() -> None:
+    for stop_event in ACTIVE_TURN_STOPS:
+        stop_event.set()
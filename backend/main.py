@@ -1,33 +1,38 @@
-import os
-import json
 import asyncio
-import threading
+import os
+from collections import deque
+import queue
 import logging
-from typing import Dict, Optional, Set
+import logging.handlers
+from typing import Any, AsyncIterator
 
+import orjson
 import uvicorn
-from dotenv import load_dotenv
-import openai
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from uvicorn.logging import DefaultFormatter
 
-from backend.config.config import CONFIG, setup_chat_client
-from backend.tools.functions import get_tools, get_available_functions
+from backend.config.config import AUDIO_MESSAGE_PREFIX, CONFIG, setup_chat_client
 from backend.models.openaisdk import validate_messages_for_ws, stream_openai_completion
 from backend.endpoints.api import router as api_router
-from backend.endpoints.state import GEN_STOP_EVENT
-from backend.tts.processor import process_streams
+from backend.endpoints.state import ACTIVE_TURN_STOPS
+from backend.tts.processor import run_tts_worker
 
-from contextlib import asynccontextmanager
+from contextlib import aclosing, asynccontextmanager, contextmanager
 
 # ------------------------------------------------------------------------------
 # Global Initialization
 # ------------------------------------------------------------------------------
-load_dotenv()
 client, DEPLOYMENT_NAME = setup_chat_client()
 
-def shutdown():
-    pass
+# Streamed text is coalesced into fewer websocket messages; TTS segmentation
+# still sees every token immediately through the phrase queue
+CONTENT_FLUSH_INTERVAL = CONFIG["PROCESSING_PIPELINE"]["CONTENT_FLUSH_INTERVAL_MS"] / 1000
+CONTENT_FLUSH_CHARS = CONFIG["PROCESSING_PIPELINE"]["CONTENT_FLUSH_CHARS"]
+
+# Bounding the audio queue makes a slow client slow down synthesis instead of
+# letting framed audio pile up in memory
+AUDIO_QUEUE_MAXSIZE = CONFIG["PROCESSING_PIPELINE"]["AUDIO_QUEUE_MAXSIZE"]
 
 # ------------------------------------------------------------------------------
 # Global Variables
@@ -37,84 +42,242 @@ logger = logging.getLogger(__name__)
 # ------------------------------------------------------------------------------
 # FastAPI App Setup
 # ------------------------------------------------------------------------------
+# Only the backend's own logger hierarchy is moved behind the queue; uvicorn's,
+# library and root loggers keep whatever handlers the host configured
+_BACKEND_LOGGER = logging.getLogger("backend")
+
+@contextmanager
+def queued_backend_logging():
+    """Route the backend logger through a queue so logging never blocks the event loop."""
+    handlers, level = list(_BACKEND_LOGGER.handlers), _BACKEND_LOGGER.level
+    targets = handlers
+    if not _BACKEND_LOGGER.hasHandlers():
+        # uvicorn's default log config only covers its own loggers, so however
+        # the app is launched the backend's INFO records would be lost; print
+        # them to stderr in uvicorn's format instead
+        default = logging.StreamHandler()
+        default.setFormatter(DefaultFormatter("%(levelprefix)s %(message)s"))
+        targets = [default]
+        if level == logging.NOTSET:
+            _BACKEND_LOGGER.setLevel(logging.INFO)
+    if not targets:
+        # Records propagate to handlers the host attached further up
+        yield
+        return
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *targets, respect_handler_level=True)
+    _BACKEND_LOGGER.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    try:
+        yield
+    finally:
+        # Flush queued records and hand the original setup back
+        listener.stop()
+        _BACKEND_LOGGER.handlers = handlers
+        _BACKEND_LOGGER.setLevel(level)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    yield
-    shutdown()
+    with queued_backend_logging():
+        yield
+        # Release the chat client's pooled HTTP connections on shutdown
+        await client.close()
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "*"],
+    allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# ------------------------------------------------------------------------------
+# WebSocket JSON Helpers
+# ------------------------------------------------------------------------------
+# JSON stays on text frames (binary frames carry tagged audio), but is encoded
+# and decoded with orjson instead of the stdlib json used by send_json/receive_json
+async def send_json_fast(websocket: WebSocket, obj: Any) -> None:
+    await websocket.send({"type": "websocket.send", "text": orjson.dumps(obj).decode()})
+
+# Content frames are the streaming hot path, so only the text itself is encoded
+# and spliced between constant halves instead of building a dict per batch
+_CONTENT_PREFIX = b'{"content":'
+_CONTENT_SUFFIX = b'}'
+
+async def send_content(websocket: WebSocket, content: str) -> None:
+    frame = b"".join((_CONTENT_PREFIX, orjson.dumps(content), _CONTENT_SUFFIX))
+    await websocket.send({"type": "websocket.send", "text": frame.decode()})
+
+async def receive_json_fast(websocket: WebSocket) -> Any:
+    # Read the raw ASGI message so JSON on binary frames is accepted too and
+    # handed to orjson without a str round trip
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    payload = message.get("text")
+    return orjson.loads(payload if payload is not None else message["bytes"])
+
 # ------------------------------------------------------------------------------
 # WebSocket Endpoint
 # ------------------------------------------------------------------------------
 @app.websocket("/ws/chat")
 async def unified_chat_websocket(websocket: WebSocket):
     await websocket.accept()
-    print("New WebSocket connection established")
+    logger.info("New WebSocket connection established")
 
+    # One TTS worker and one audio forwarder serve every turn on this
+    # connection; each chat turn hands the worker its own phrase queue and
+    # stop event. turn_stops holds the stop events of this connection's turns
+    # whose audio has not finished, oldest first, in the order the forwarder
+    # meets their frames. The TaskGroup ties both tasks to the connection.
+    turn_queue = asyncio.Queue()
+    audio_queue = asyncio.Queue(maxsize=AUDIO_QUEUE_MAXSIZE)
+    turn_stops = deque()
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tts_task = tg.create_task(run_tts_worker(turn_queue, audio_queue))
+            audio_forward_task = tg.create_task(forward_audio_to_websocket(
+                audio_queue, websocket, turn_stops
+            ))
+            try:
+                await serve_chat_messages(websocket, turn_queue, turn_stops)
+            finally:
+                # Nobody is left to hear pending audio, so stop this
+                # connection's turns rather than drain them
+                for stop_event in turn_stops:
+                    stop_event.set()
+                    ACTIVE_TURN_STOPS.discard(stop_event)
+                tts_task.cancel()
+                audio_forward_task.cancel()
+                # Empty the bounded audio queue so a cancelled producer can still
+                # post its end-of-turn marker instead of waiting for room forever
+                while not audio_queue.empty():
+                    audio_queue.get_nowait()
+    except* Exception as group:
+        for exc in group.exceptions:
+            logger.error("WebSocket connection task failed: %s", exc)
+    finally:
+        await websocket.close()
+
+async def serve_chat_messages(websocket: WebSocket, turn_queue: asyncio.Queue, turn_stops: deque):
+    """Handle chat actions from one websocket until it disconnects."""
     try:
         while True:
-            data = await websocket.receive_json()
+            data = await receive_json_fast(websocket)
             action = data.get("action")
 
             if action == "reset-context":
-                print("Resetting context for future messages...")
-                # Clear the stop event to ensure a fresh start for the next message
-                GEN_STOP_EVENT.clear()
+                logger.info("Resetting context for future messages")
                 # Acknowledge the reset
-                await websocket.send_json({"type": "context_reset", "status": "success"})
+                await send_json_fast(websocket, {"type": "context_reset", "status": "success"})
                 continue
 
             if action == "chat":
-                print("\nProcessing new chat message...")                
-                # Clear event for the new chat.
-                GEN_STOP_EVENT.clear()
+                logger.info("Processing new chat message")
 
                 messages = data.get("messages", [])
                 validated = await validate_messages_for_ws(messages)
 
+                # A fresh stop event per turn, so a stop never leaks into the
+                # next turn or into other connections' later turns
+                stop_event = asyncio.Event()
+                ACTIVE_TURN_STOPS.add(stop_event)
+                turn_stops.append(stop_event)
                 phrase_queue = asyncio.Queue()
-                audio_queue = asyncio.Queue()
-
-                process_streams_task = asyncio.create_task(process_streams(
-                    phrase_queue, audio_queue, GEN_STOP_EVENT
-                ))
-
-                audio_forward_task = asyncio.create_task(forward_audio_to_websocket(
-                    audio_queue, websocket, GEN_STOP_EVENT
-                ))
+                turn_queue.put_nowait((phrase_queue, stop_event))
 
                 try:
-                    async for content in stream_openai_completion(
+                    stream = stream_openai_completion(
                         client, 
                         DEPLOYMENT_NAME, 
                         validated, 
                         phrase_queue,
-                        GEN_STOP_EVENT
-                    ):
-                        if GEN_STOP_EVENT.is_set():
-                            break
-                        print(f"Sending content chunk: {content[:50]}...")
-                        await websocket.send_json({"content": content})
+                        stop_event
+                    )
+                    async with aclosing(coalesce_content(stream)) as batches:
+                        async for batch in batches:
+                            if stop_event.is_set():
+                                break
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Sending content chunk: %s...", batch[:50])
+                            await send_content(websocket, batch)
                 finally:
-                    print("Chat stream finished, cleaning up...")
+                    # Ends this turn's phrases; the TTS worker finishes them in
+                    # the background while the next message is read
+                    logger.info("Chat stream finished")
                     await phrase_queue.put(None)
-                    await process_streams_task
-                    await audio_forward_task
-                    print("Cleanup completed")
     except WebSocketDisconnect:
         pass
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
+
+async def coalesce_content(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Batch streamed text into fewer websocket messages.
+
+    A batch is flushed once it reaches CONTENT_FLUSH_CHARS or once
+    CONTENT_FLUSH_INTERVAL has passed since the previous flush. While text is
+    pending, the next chunk is awaited against that deadline, so a pause in
+    the stream (e.g. a tool call) never holds back text already received.
+    """
+    loop = asyncio.get_running_loop()
+    pending = []
+    pending_chars = 0
+    # Start one interval in the past so the first token goes out immediately
+    last_flush = loop.time() - CONTENT_FLUSH_INTERVAL
+    next_chunk = None
+    try:
+        while True:
+            if pending or next_chunk is not None:
+                # Keep a single pending read of the stream so it can be waited
+                # on with a deadline and resumed after a timed flush
+                if next_chunk is None:
+                    next_chunk = asyncio.ensure_future(anext(chunks))
+                if pending:
+                    timeout = last_flush + CONTENT_FLUSH_INTERVAL - loop.time()
+                    done, _ = await asyncio.wait((next_chunk,), timeout=timeout)
+                    if not done:
+                        yield "".join(pending)
+                        pending.clear()
+                        pending_chars = 0
+                        last_flush = loop.time()
+                        continue
+                ready, next_chunk = next_chunk, None
+                try:
+                    content = await ready
+                except StopAsyncIteration:
+                    if pending:
+                        yield "".join(pending)
+                    return
+                except Exception:
+                    # Text received before the stream failed still reaches
+                    # the client ahead of the error
+                    if pending:
+                        yield "".join(pending)
+                    raise
+            else:
+                try:
+                    content = await anext(chunks)
+                except StopAsyncIteration:
+                    return
+            pending.append(content)
+            pending_chars += len(content)
+            now = loop.time()
+            if pending_chars >= CONTENT_FLUSH_CHARS or now - last_flush >= CONTENT_FLUSH_INTERVAL:
+                yield "".join(pending)
+                pending.clear()
+                pending_chars = 0
+                last_flush = now
     finally:
-        await websocket.close()
+        if next_chunk is not None:
+            next_chunk.cancel()
+            # Wait without re-raising: the read may already have finished with
+            # an error, which must not replace the exception unwinding this
+            # generator. Retrieving it keeps asyncio from logging it as unhandled.
+            await asyncio.wait((next_chunk,))
+            if not next_chunk.cancelled():
+                next_chunk.exception()
 
 # ------------------------------------------------------------------------------
 # Audio Forwarding Function
@@ -122,34 +285,43 @@ async def unified_chat_websocket(websocket: WebSocket):
 async def forward_audio_to_websocket(
     audio_queue: asyncio.Queue, 
     websocket: WebSocket,
-    stop_event: asyncio.Event
+    turn_stops: deque
 ):
+    """
+    Forward tagged audio frames for every turn on a connection.
+
+    Frames arrive turn by turn, and each None on the queue ends one turn and
+    is sent as a bare end-of-audio marker. The head of turn_stops is the stop
+    event of the turn currently being forwarded; once it is set, that turn's
+    frames are dropped up to its marker, so a stopped turn ends promptly
+    without leaking into the next one.
+    Frames already waiting in the queue are merged into one websocket message.
+    """
+    prefix_len = len(AUDIO_MESSAGE_PREFIX)
     try:
         while True:
-            if stop_event.is_set():
-                print("Audio forwarding stopped by stop event")
-                await websocket.send_bytes(b'audio:')  # Send empty audio marker
-                break
-
-            try:
-                audio_data = await audio_queue.get()
-                if audio_data is None:
-                    print("Received None in audio queue, sending audio end marker")
-                    await websocket.send_bytes(b'audio:')
+            audio_data = await audio_queue.get()
+            stop_event = turn_stops[0]
+            # TTS producers frame audio with the prefix themselves, so the first
+            # frame is kept whole and later ones contribute only their payload
+            frames = []
+            while audio_data is not None:
+                if not stop_event.is_set():
+                    frames.append(memoryview(audio_data)[prefix_len:] if frames else audio_data)
+                if audio_queue.empty():
                     break
-                # Prepend "audio:" if not already present.
-                message = b'audio:' + audio_data if not audio_data.startswith(b'audio:') else audio_data
-                await websocket.send_bytes(message)
-            except Exception as e:
-                print(f"Error forwarding audio to websocket: {e}")
-                break
+                audio_data = audio_queue.get_nowait()
+            if frames:
+                await websocket.send_bytes(frames[0] if len(frames) == 1 else b"".join(frames))
+            if audio_data is None:
+                # This turn is over, so a later stop request no longer applies to it
+                ACTIVE_TURN_STOPS.discard(turn_stops.popleft())
+                logger.debug("Turn audio finished, sending end marker")
+                await websocket.send_bytes(AUDIO_MESSAGE_PREFIX)
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        print(f"Forward audio task error: {e}")
-    finally:
-        try:
-            await websocket.send_bytes(b'audio:')
-        except Exception as e:
-            print(f"Error sending final empty message: {e}")
+        logger.error("Forward audio task error: %s", e)
 
 # ------------------------------------------------------------------------------
 # Include Additional API Routes & Run Uvicorn
@@ -157,4 +329,12 @@ async def forward_audio_to_websocket(
 app.include_router(api_router)
 
 if __name__ == "__main__":
+    # Stop events and the TTS toggle live in process memory, so with several
+    # workers a stop or toggle request would only reach the chats served by
+    # whichever worker received it; the backend runs as a single process
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        raise SystemExit("WEB_CONCURRENCY > 1 is not supported: stop and TTS toggle state is per-process")
+    # The loop, HTTP and websocket implementations stay on "auto", which picks
+    # uvloop, httptools and websockets when installed and falls back cleanly
+    # where they are not.
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import json
+import logging
 import re
 from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
 import asyncio
@@ -9,22 +10,31 @@ from backend.config.config import CONFIG
 from backend.tools.functions import get_tools, get_available_functions
 from backend.tools.helpers import get_function_and_args
 
+logger = logging.getLogger(__name__)
+
+# Logging flags are read once at import; they are not toggled at runtime
+_LOGGING_CFG = CONFIG.get("LOGGING", {})
+_PRINT_SEGMENTS = bool(_LOGGING_CFG.get("PRINT_SEGMENTS", False))
+_PRINT_TOOL_CALLS = bool(_LOGGING_CFG.get("PRINT_TOOL_CALLS", False))
+_PRINT_FUNCTION_CALLS = bool(_LOGGING_CFG.get("PRINT_FUNCTION_CALLS", False))
+
 def log_segment(segment: str) -> None:
-    """Prints the segment if logging is enabled in the config."""
-    if CONFIG.get("LOGGING", {}).get("PRINT_SEGMENTS", False):
-        print(f"Segment: {segment}")
+    """Logs the segment if logging is enabled in the config."""
+    if not _PRINT_SEGMENTS:
+        return
+    logger.info("Segment: %s", segment)
 
 def log_tool_calls(tool_calls: List[Dict[str, Any]]) -> None:
-    """Prints the tool call schema if logging is enabled in the config."""
-    if CONFIG.get("LOGGING", {}).get("PRINT_TOOL_CALLS", False):
-        print("Tool Call Schema:")
-        print(json.dumps(tool_calls, indent=4))
+    """Logs the tool call schema if logging is enabled in the config."""
+    if not _PRINT_TOOL_CALLS or not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info("Tool Call Schema:\n%s", json.dumps(tool_calls, indent=4))
 
 def log_function_call_result(function_name: str, result: Any) -> None:
-    """Prints the output of a function call if logging is enabled in the config."""
-    if CONFIG.get("LOGGING", {}).get("PRINT_FUNCTION_CALLS", False):
-        print(f"Function {function_name} output:")
-        print(json.dumps(result, indent=4))
+    """Logs the output of a function call if logging is enabled in the config."""
+    if not _PRINT_FUNCTION_CALLS or not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info("Function %s output:\n%s", function_name, json.dumps(result, indent=4))
 
 def extract_content_from_openai_chunk(chunk: Any) -> Optional[str]:
     try:
@@ -40,6 +50,17 @@ def compile_delimiter_pattern(delimiters: List[str]) -> Optional[re.Pattern]:
     pattern = "|".join(escaped)
     return re.compile(pattern)
 
+# Segmentation settings are static, so the delimiter regex is compiled once
+_PIPELINE_CFG = CONFIG["PROCESSING_PIPELINE"]
+DELIMITER_PATTERN = compile_delimiter_pattern(_PIPELINE_CFG["DELIMITERS"])
+_MAX_DELIMITER_LEN = max(map(len, _PIPELINE_CFG["DELIMITERS"]), default=0)
+_SYSTEM_PROMPT = CONFIG["LLM_SETTINGS"]["SYSTEM_PROMPT"]
+
+# Tool schemas and the function table are static, so they are built once
+# instead of on every completion request
+_TOOLS = get_tools()
+_AVAILABLE_FUNCTIONS = get_available_functions()
+
 async def process_chunks(chunk_queue: asyncio.Queue,
                          phrase_queue: asyncio.Queue,
                          delimiter_pattern: Optional[re.Pattern],
@@ -61,10 +82,13 @@ async def process_chunks(chunk_queue: asyncio.Queue,
 
         content = extract_content_from_openai_chunk(chunk)
         if content:
+            # Text already scanned held no delimiter; only a delimiter that
+            # straddles the old end can start before the new content
+            scan_from = max(0, len(working_string) - _MAX_DELIMITER_LEN + 1)
             working_string += content
             if segmentation_active and delimiter_pattern:
                 while True:
-                    match = delimiter_pattern.search(working_string)
+                    match = delimiter_pattern.search(working_string, scan_from)
                     if match:
                         end_idx = match.end()
                         phrase = working_string[:end_idx].strip()
@@ -73,6 +97,7 @@ async def process_chunks(chunk_queue: asyncio.Queue,
                             await phrase_queue.put(phrase)
                             chars_processed += len(phrase)
                         working_string = working_string[end_idx:]
+                        scan_from = 0
                         if chars_processed >= character_max:
                             segmentation_active = False
                             break
@@ -82,7 +107,7 @@ async def process_chunks(chunk_queue: asyncio.Queue,
 async def validate_messages_for_ws(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     if not isinstance(messages, list):
         raise HTTPException(status_code=400, detail="'messages' must be a list.")
-    prepared = []
+    prepared = [{"role": "system", "content": _SYSTEM_PROMPT}]
     for idx, msg in enumerate(messages):
         if not isinstance(msg, dict):
             raise HTTPException(status_code=400, detail=f"Message at index {idx} must be a dictionary.")
@@ -96,16 +121,14 @@ async def validate_messages_for_ws(messages: List[Dict[str, Any]]) -> List[Dict[
         if role is None:
             raise HTTPException(status_code=400, detail=f"Invalid sender at index {idx}.")
         prepared.append({"role": role, "content": text})
-    system_prompt = {"role": "system", "content": CONFIG["LLM_SETTINGS"]["SYSTEM_PROMPT"]}
-    prepared.insert(0, system_prompt)
     return prepared
 
 async def stream_openai_completion(client, model: str, messages: Sequence[Dict[str, Union[str, Any]]],
                                    phrase_queue: asyncio.Queue,
                                    stop_event: asyncio.Event) -> AsyncIterator[str]:
-    delimiter_pattern = compile_delimiter_pattern(CONFIG["PROCESSING_PIPELINE"]["DELIMITERS"])
-    use_segmentation = CONFIG["PROCESSING_PIPELINE"]["USE_SEGMENTATION"]
-    character_max = CONFIG["PROCESSING_PIPELINE"]["CHARACTER_MAXIMUM"]
+    delimiter_pattern = DELIMITER_PATTERN
+    use_segmentation = _PIPELINE_CFG["USE_SEGMENTATION"]
+    character_max = _PIPELINE_CFG["CHARACTER_MAXIMUM"]
 
     chunk_queue = asyncio.Queue()
     chunk_processor_task = asyncio.create_task(
@@ -116,7 +139,7 @@ async def stream_openai_completion(client, model: str, messages: Sequence[Dict[s
         response = await client.chat.completions.create(
             model=model,
             messages=messages,
-            tools=get_tools(),
+            tools=_TOOLS,
             tool_choice="auto",
             stream=True,
             temperature=0.7,
@@ -153,7 +176,7 @@ async def stream_openai_completion(client, model: str, messages: Sequence[Dict[s
         if not stop_event.is_set() and tool_calls:
             messages.append({"role": "assistant", "tool_calls": tool_calls})
             log_tool_calls(tool_calls)
-            funcs = get_available_functions()
+            funcs = _AVAILABLE_FUNCTIONS
             for tc in tool_calls:
                 try:
                     fn, fn_args = get_function_and_args(tc, funcs)
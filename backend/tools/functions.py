@@ -3,9 +3,6 @@ from datetime import datetime
 import requests
 import pytz
 from timezonefinder import TimezoneFinder
-from dotenv import load_dotenv
-
-load_dotenv()
 
 def fetch_weather(lat=28.5383, lon=-81.3792, exclude="minutely", units="metric", lang="en"):
     api_key = os.getenv('OPENWEATHER_API_KEY')
@@ -1,10 +1,15 @@
 import inspect
+from functools import lru_cache
 from typing import Callable, Dict, Tuple
 import json
 
+@lru_cache(maxsize=None)
+def _signature_parameters(function: Callable):
+    """Signature introspection is costly and tool functions never change, so it is cached."""
+    return inspect.signature(function).parameters
+
 def check_args(function: Callable, args: dict) -> bool:
-    sig = inspect.signature(function)
-    params = sig.parameters
+    params = _signature_parameters(function)
     for name in args:
         if name not in params:
             return False
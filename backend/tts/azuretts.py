@@ -1,101 +1,97 @@
-import os
 import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
 import azure.cognitiveservices.speech as speechsdk
-from ..config.config import CONFIG
+from ..config.config import CONFIG, AUDIO_MESSAGE_PREFIX, AZURE_SPEECH_KEY, AZURE_SPEECH_REGION
 
-class AzureTTS:
-    def __init__(self):
-        self.speech_config = speechsdk.SpeechConfig(
-            subscription=os.getenv("AZURE_SPEECH_KEY"),
-            region=os.getenv("AZURE_SPEECH_REGION")
-        )
-        self.audio_format = getattr(
-            speechsdk.SpeechSynthesisOutputFormat,
-            CONFIG["TTS_MODELS"]["AZURE_TTS"]["AUDIO_FORMAT"]
-        )
-        self.speech_config.set_speech_synthesis_output_format(self.audio_format)
-        
-    async def stream_to_audio(self, text):
-        audio_queue = asyncio.Queue()
-        stop_event = asyncio.Event()
-        
-        push_stream_callback = PushAudioOutputStreamCallback(audio_queue, stop_event)
-        push_stream = speechsdk.audio.PushAudioOutputStream(push_stream_callback)
-        audio_cfg = speechsdk.audio.AudioOutputConfig(stream=push_stream)
-        
-        synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=self.speech_config, 
-            audio_config=audio_cfg
-        )
-        
-        ssml = self._create_ssml(text)
-        result_future = synthesizer.speak_ssml_async(ssml)
-        
-        try:
-            await asyncio.get_event_loop().run_in_executor(None, result_future.get)
-            while True:
-                chunk = await audio_queue.get()
-                if chunk is None:
-                    break
-                yield chunk
-        except Exception:
-            stop_event.set()
-            yield None
-            
-    def _create_ssml(self, text):
-        # Popular Azure TTS voices:
-        # English (US):
-        #   - en-US-JennyNeural - Female, conversational
-        #   - en-US-GuyNeural - Male, conversational
-        #   - en-US-AriaNeural - Female, professional
-        #   - en-US-DavisNeural - Male, professional
-        #   - en-US-JasonNeural - Male, narration
-        #   - en-US-SaraNeural - Female, casual
-        #   - en-US-TonyNeural - Male, enthusiastic
-        #   - en-US-NancyNeural - Female, warm
-        # English (UK):
-        #   - en-GB-SoniaNeural - Female, professional
-        #   - en-GB-RyanNeural - Male, professional
-        # English (Australia):
-        #   - en-AU-NatashaNeural - Female, professional
-        #   - en-AU-WilliamNeural - Male, professional
-        voice = CONFIG["TTS_MODELS"]["AZURE_TTS"]["TTS_VOICE"]
-        prosody = CONFIG["TTS_MODELS"]["AZURE_TTS"]["PROSODY"]
-        return f"""
-<speak version='1.0' xml:lang='en-US'>
-    <voice name='{voice}'>
-        <prosody rate='{prosody["rate"]}' pitch='{prosody["pitch"]}' volume='{prosody["volume"]}'>
-            {text}
-        </prosody>
-    </voice>
-</speak>
-"""
+logger = logging.getLogger(__name__)
+
+# Longest the SDK thread waits for room in the bounded audio queue. A consumer
+# that has made no room by then is treated as gone: the rest of the turn's
+# audio is refused and synthesis is stopped, rather than dropping single chunks
+# and leaving gaps mid-phrase while playback carries on
+AUDIO_PUT_TIMEOUT = 5.0
+# How often a blocked write rechecks the stop and refusal flags while it waits
+AUDIO_PUT_POLL_INTERVAL = 0.1
+
+# CONFIG is frozen at import, so the Azure settings are looked up once
+_AZURE_TTS_CFG = CONFIG["TTS_MODELS"]["AZURE_TTS"]
 
 class PushAudioOutputStreamCallback(speechsdk.audio.PushAudioOutputStreamCallback):
-    def __init__(self, audio_queue: asyncio.Queue, stop_event: asyncio.Event):
+    def __init__(self, audio_queue: asyncio.Queue, stop_event: asyncio.Event,
+                 audio_refused: threading.Event, synthesis_done: asyncio.Future):
         super().__init__()
         self.audio_queue = audio_queue
         self.stop_event = stop_event
+        # Set once the websocket is gone or the queue stayed full past
+        # AUDIO_PUT_TIMEOUT; nothing drains the queue after that, so every
+        # later chunk of the turn is refused at once
+        self.audio_refused = audio_refused
+        # Resolved early on a stall, so the processor stops the synthesizer
+        self.synthesis_done = synthesis_done
         self.loop = asyncio.get_event_loop()
 
     def write(self, data: memoryview) -> int:
-        if self.stop_event.is_set():
+        if self.audio_refused.is_set() or self.stop_event.is_set():
             return 0
-        self.loop.call_soon_threadsafe(self.audio_queue.put_nowait, data.tobytes())
-        return len(data)
+        # Concatenating onto the prefix frames the chunk in the same single
+        # copy that tobytes() used to make
+        frame = AUDIO_MESSAGE_PREFIX + data
+        # The audio queue is bounded, so block this SDK thread until the loop
+        # has room; that is what slows synthesis down for a slow client
+        put = self.audio_queue.put(frame)
+        try:
+            future = asyncio.run_coroutine_threadsafe(put, self.loop)
+        except RuntimeError:
+            # The event loop has already been closed
+            put.close()
+            return 0
+        deadline = time.monotonic() + AUDIO_PUT_TIMEOUT
+        while True:
+            try:
+                future.result(timeout=AUDIO_PUT_POLL_INTERVAL)
+                return len(data)
+            except concurrent.futures.TimeoutError:
+                pass
+            if self.audio_refused.is_set() or self.stop_event.is_set():
+                future.cancel()
+                return 0
+            if time.monotonic() >= deadline:
+                future.cancel()
+                logger.warning("Audio queue stayed full for %.1fs, stopping Azure TTS for this turn", AUDIO_PUT_TIMEOUT)
+                self.audio_refused.set()
+                _notify_done(self.loop, self.synthesis_done)
+                return 0
 
     def close(self):
-        self.loop.call_soon_threadsafe(self.audio_queue.put_nowait, None)
+        # Each phrase has its own push stream, so closing one does not end the
+        # turn; process_streams sends the single end-of-turn marker
+        pass
+
+def _resolve(future: asyncio.Future) -> None:
+    """Mark a phrase's synthesis finished; runs on the event loop."""
+    if not future.done():
+        future.set_result(None)
+
+def _notify_done(loop: asyncio.AbstractEventLoop, future: asyncio.Future) -> None:
+    """Resolve a phrase's future from the SDK thread, unless the loop is gone."""
+    try:
+        loop.call_soon_threadsafe(_resolve, future)
+    except RuntimeError:
+        # The event loop was closed while the synthesizer was still running
+        pass
 
 async def azure_text_to_speech_processor(phrase_queue: asyncio.Queue,
                                            audio_queue: asyncio.Queue,
                                            stop_event: asyncio.Event):
     try:
         speech_config = speechsdk.SpeechConfig(
-            subscription=os.getenv("AZURE_SPEECH_KEY"),
-            region=os.getenv("AZURE_SPEECH_REGION")
+            subscription=AZURE_SPEECH_KEY,
+            region=AZURE_SPEECH_REGION
         )
-        prosody = CONFIG["TTS_MODELS"]["AZURE_TTS"]["PROSODY"]
+        prosody = _AZURE_TTS_CFG["PROSODY"]
         # Popular Azure TTS voices:
         # English (US):
         #   - en-US-JennyNeural - Female, conversational
@@ -112,21 +108,21 @@ async def azure_text_to_speech_processor(phrase_queue: asyncio.Queue,
         # English (Australia):
         #   - en-AU-NatashaNeural - Female, professional
         #   - en-AU-WilliamNeural - Male, professional
-        voice = CONFIG["TTS_MODELS"]["AZURE_TTS"]["TTS_VOICE"]
+        voice = _AZURE_TTS_CFG["TTS_VOICE"]
         audio_format = getattr(
             speechsdk.SpeechSynthesisOutputFormat,
-            CONFIG["TTS_MODELS"]["AZURE_TTS"]["AUDIO_FORMAT"]
+            _AZURE_TTS_CFG["AUDIO_FORMAT"]
         )
         speech_config.set_speech_synthesis_output_format(audio_format)
+        loop = asyncio.get_running_loop()
+        audio_refused = threading.Event()
 
         while True:
             if stop_event.is_set():
-                await audio_queue.put(None)
                 return
 
             phrase = await phrase_queue.get()
             if phrase is None or phrase.strip() == "":
-                await audio_queue.put(None)
                 return
 
             try:
@@ -139,15 +135,34 @@ async def azure_text_to_speech_processor(phrase_queue: asyncio.Queue,
     </voice>
 </speak>
 """
-                push_stream_callback = PushAudioOutputStreamCallback(audio_queue, stop_event)
+                # Wait on the synthesizer's own completion events instead of
+                # parking an executor thread on result_future.get per phrase
+                synthesis_done = loop.create_future()
+                push_stream_callback = PushAudioOutputStreamCallback(
+                    audio_queue, stop_event, audio_refused, synthesis_done
+                )
                 push_stream = speechsdk.audio.PushAudioOutputStream(push_stream_callback)
                 audio_cfg = speechsdk.audio.AudioOutputConfig(stream=push_stream)
                 synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_cfg)
-                result_future = synthesizer.speak_ssml_async(ssml_phrase)
-                await asyncio.get_event_loop().run_in_executor(None, result_future.get)
+                on_done = lambda evt, done=synthesis_done: _notify_done(loop, done)
+                synthesizer.synthesis_completed.connect(on_done)
+                synthesizer.synthesis_canceled.connect(on_done)
+                synthesizer.speak_ssml_async(ssml_phrase)
+                try:
+                    await synthesis_done
+                except asyncio.CancelledError:
+                    # The TTS worker is only cancelled when the websocket goes
+                    # away: refuse further chunks and stop the SDK synthesizing
+                    audio_refused.set()
+                    synthesizer.stop_speaking_async()
+                    raise
+                if audio_refused.is_set():
+                    # The consumer stalled; end the turn's audio here instead
+                    # of speaking the remaining phrases into a full queue
+                    synthesizer.stop_speaking_async()
+                    return
             except Exception:
-                await audio_queue.put(None)
                 return
 
-    except Exception:
-        await audio_queue.put(None)
+    except Exception as e:
+        logger.error("Error in Azure TTS processor: %s", e)
@@ -1,63 +1,44 @@
-import os
 import asyncio
+import logging
+from operator import itemgetter
 import openai
 from typing import Optional
-from ..config.config import CONFIG
+from ..config.config import CONFIG, AUDIO_MESSAGE_PREFIX, OPENAI_API_KEY
 
-class OpenAITTS:
-    def __init__(self):
-        self.client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.model = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_MODEL"]
-        self.voice = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_VOICE"]
-        self.speed = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_SPEED"]
-        self.response_format = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["AUDIO_RESPONSE_FORMAT"]
-        self.chunk_size = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_CHUNK_SIZE"]
+logger = logging.getLogger(__name__)
 
-    async def stream_to_audio(self, text):
-        if not text.strip():
-            return
-        
-        try:
-            async with self.client.audio.speech.with_streaming_response.create(
-                model=self.model,
-                voice=self.voice,
-                input=text.strip(),
-                speed=self.speed,
-                response_format=self.response_format
-            ) as response:
-                async for audio_chunk in response.iter_bytes(self.chunk_size):
-                    yield audio_chunk
-                yield b'\x00' * self.chunk_size
-        except Exception:
-            yield None
+# Unpacks every OPENAI_TTS setting the processor needs in one C-level call
+_get_tts_settings = itemgetter(
+    "TTS_MODEL", "TTS_VOICE", "TTS_SPEED",
+    "AUDIO_RESPONSE_FORMAT", "TTS_CHUNK_SIZE", "BUFFER_SIZE",
+)
 
 async def openai_text_to_speech_processor(phrase_queue: asyncio.Queue,
                                           audio_queue: asyncio.Queue,
                                           stop_event: asyncio.Event,
                                           openai_client: Optional[openai.AsyncOpenAI] = None):
-    openai_client = openai_client or openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    openai_client = openai_client or openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
     try:
-        model = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_MODEL"]
-        voice = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_VOICE"]
-        speed = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_SPEED"]
-        response_format = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["AUDIO_RESPONSE_FORMAT"]
-        chunk_size = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_CHUNK_SIZE"]
-        buffer_size = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["BUFFER_SIZE"]
+        (model, voice, speed,
+         response_format, chunk_size, buffer_size) = _get_tts_settings(CONFIG["TTS_MODELS"]["OPENAI_TTS"])
     except KeyError:
-        await audio_queue.put(None)
         return
 
     try:
-        audio_buffer = bytearray()
+        # Chunks are collected by reference and joined once per flush, which
+        # copies each byte once instead of into a bytearray and out again.
+        # The list is seeded with the wire prefix so each flush is already a
+        # complete audio frame.
+        pending_chunks = [AUDIO_MESSAGE_PREFIX]
+        pending_bytes = 0
+        silence_gap = AUDIO_MESSAGE_PREFIX + bytes(chunk_size)
         
         while True:
             if stop_event.is_set():
-                await audio_queue.put(None)
                 return
 
             phrase = await phrase_queue.get()
             if phrase is None:
-                await audio_queue.put(None)
                 return
 
             stripped_phrase = phrase.strip()
@@ -77,26 +58,27 @@ async def openai_text_to_speech_processor(phrase_queue: asyncio.Queue,
                             break
                             
                         # Add chunk to buffer
-                        audio_buffer.extend(audio_chunk)
+                        pending_chunks.append(audio_chunk)
+                        pending_bytes += len(audio_chunk)
                         
                         # When buffer reaches threshold, send it
-                        if len(audio_buffer) >= buffer_size:
-                            await audio_queue.put(bytes(audio_buffer))
-                            audio_buffer.clear()
+                        if pending_bytes >= buffer_size:
+                            await audio_queue.put(b"".join(pending_chunks))
+                            del pending_chunks[1:]
+                            pending_bytes = 0
                     
                     # Send any remaining buffered audio
-                    if audio_buffer:
-                        await audio_queue.put(bytes(audio_buffer))
-                        audio_buffer.clear()
+                    if pending_bytes:
+                        await audio_queue.put(b"".join(pending_chunks))
+                        del pending_chunks[1:]
+                        pending_bytes = 0
                         
                     # Add a small silence gap between phrases
-                    await audio_queue.put(b'\x00' * chunk_size)
+                    await audio_queue.put(silence_gap)
                     
             except Exception as e:
-                print(f"Error in OpenAI TTS streaming: {e}")
-                await audio_queue.put(None)
+                logger.error("Error in OpenAI TTS streaming: %s", e)
                 return
 
     except Exception as e:
-        print(f"Error in OpenAI TTS processor: {e}")
-        await audio_queue.put(None)
+        logger.error("Error in OpenAI TTS processor: %s", e)
@@ -1,26 +1,33 @@
 import asyncio
 import logging
-from typing import Optional, Callable
 
-from backend.config.config import CONFIG
+from backend.config.config import AUDIO_CFG, TTS_PROVIDER
 
 logger = logging.getLogger(__name__)
 
-def format_audio_message(audio_data: bytes) -> bytes:
-    """Ensures consistent audio message formatting with the 'audio:' prefix"""
-    if audio_data is None:
-        return b'audio:'  # End of stream marker
-    return b'audio:' + audio_data if not audio_data.startswith(b'audio:') else audio_data
+# The provider is fixed at startup, so its processor is imported once here
+# rather than on every turn inside process_streams
+if TTS_PROVIDER == "azure":
+    from backend.tts.azuretts import azure_text_to_speech_processor as _tts_processor
+elif TTS_PROVIDER == "openai":
+    from backend.tts.openaitts import openai_text_to_speech_processor as _tts_processor
+else:
+    _tts_processor = None
+
+# Audio framing is a producer invariant: every provider puts bytes that already
+# start with AUDIO_MESSAGE_PREFIX, so the forwarder sends them without a check
+# or copy per frame
 
 async def process_streams(phrase_queue: asyncio.Queue, audio_queue: asyncio.Queue, stop_event: asyncio.Event):
     """
     Orchestrates TTS tasks, with an external stop_event.
-    Ensures that a termination signal is sent to the audio_queue.
+    Ensures that exactly one termination signal is sent to the audio_queue
+    per call; the providers never send it themselves.
     """
-    logger.debug(f"TTS enabled: {CONFIG['GENERAL_AUDIO']['TTS_ENABLED']}")
-    logger.debug(f"TTS provider: {CONFIG['TTS_MODELS']['PROVIDER']}")
+    logger.debug("TTS enabled: %s", AUDIO_CFG.tts_enabled)
+    logger.debug("TTS provider: %s", TTS_PROVIDER)
     
-    if not CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"]:
+    if not AUDIO_CFG.tts_enabled:
         logger.debug("TTS is disabled, draining phrase queue")
         while True:
             phrase = await phrase_queue.get()
@@ -30,32 +37,31 @@ async def process_streams(phrase_queue: asyncio.Queue, audio_queue: asyncio.Queu
         return
 
     try:
-        provider = CONFIG["TTS_MODELS"]["PROVIDER"].lower()
-        if provider == "azure":
-            from backend.tts.azuretts import azure_text_to_speech_processor
-            tts_task = azure_text_to_speech_processor(phrase_queue, audio_queue, stop_event)
-        elif provider == "openai":
-            from backend.tts.openaitts import openai_text_to_speech_processor
-            tts_task = openai_text_to_speech_processor(phrase_queue, audio_queue, stop_event)
-        else:
-            logger.error(f"Unknown TTS provider: {provider}")
+        if _tts_processor is None:
+            logger.error("Unknown TTS provider: %s", TTS_PROVIDER)
             return
+        tts_task = _tts_processor(phrase_queue, audio_queue, stop_event)
 
         # Process TTS and send audio to frontend
         logger.debug("Processing TTS for frontend playback")
         await tts_task
 
     except Exception as e:
-        logger.error(f"Error in process_streams: {e}")
+        logger.error("Error in process_streams: %s", e)
     finally:
         # Signal termination
         logger.debug("Signaling audio queue termination")
         await audio_queue.put(None)
 
-from backend.tts.azuretts import AzureTTS
-from backend.tts.openaitts import OpenAITTS
-
-class AudioProcessor:
-    def __init__(self):
-        self.azure_tts = AzureTTS()
-        self.openai_tts = OpenAITTS()
+async def run_tts_worker(turn_queue: asyncio.Queue, audio_queue: asyncio.Queue):
+    """
+    Long-lived TTS worker for one websocket connection.
+    Each item on turn_queue is the (phrase_queue, stop_event) pair of one chat
+    turn, processed in order through process_streams; a None item ends the worker.
+    """
+    while True:
+        turn = await turn_queue.get()
+        if turn is None:
+            break
+        phrase_queue, stop_event = turn
+        await process_streams(phrase_queue, audio_queue, stop_event)
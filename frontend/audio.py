@@ -2,11 +2,37 @@
 import asyncio
 import json
 import logging
+import threading
 from PyQt6.QtCore import QObject, pyqtSignal, QMutex, QMutexLocker, QIODevice
 from PyQt6.QtMultimedia import QAudioFormat, QAudioSink, QMediaDevices, QAudio
 import time
 
-from frontend.config import logger
+from frontend.config import AUDIO_MESSAGE_TAG, PLAYBACK_CONFIG, logger
+
+def sink_buffer_size() -> int:
+    """
+    Compute the audio sink buffer size in bytes from the playback format.
+
+    The buffer holds latency_ms worth of frames, but never fewer than
+    min_frames_per_buffer, and is always a whole number of sample frames, so
+    reads never end mid-frame. TTS stalls are absorbed by QueueAudioDevice's
+    queue, not by the sink buffer, so a larger buffer would only add latency.
+    """
+    frame_bytes = PLAYBACK_CONFIG['channels'] * PLAYBACK_CONFIG['sample_width']
+    frames = max(
+        PLAYBACK_CONFIG['min_frames_per_buffer'],
+        PLAYBACK_CONFIG['sample_rate'] * PLAYBACK_CONFIG['latency_ms'] // 1000
+    )
+    return frames * frame_bytes
+
+# Resolve the playback format once at import rather than per sink setup
+SAMPLE_FORMATS = {
+    1: QAudioFormat.SampleFormat.UInt8,
+    2: QAudioFormat.SampleFormat.Int16,
+    4: QAudioFormat.SampleFormat.Int32,
+}
+PLAYBACK_SAMPLE_FORMAT = SAMPLE_FORMATS.get(PLAYBACK_CONFIG['sample_width'], QAudioFormat.SampleFormat.Int16)
+SINK_BUFFER_SIZE = sink_buffer_size()
 
 # -----------------------------------------------------------------------------
 #                             AUDIO DEVICE CLASS
@@ -16,14 +42,31 @@ class QueueAudioDevice(QIODevice):
     """
     Custom QIODevice implementation that uses a buffer to queue audio data.
     This allows for asynchronous audio playback from the websocket.
+
+    Audio is double-buffered: writers append to the front buffer while the
+    sink drains the back buffer, and the two are swapped in O(1) once the
+    back buffer is exhausted. The swap lock is only held for an append or a
+    swap, never while the sink copies data out.
     """
+    # Emitted once queued audio is gone after end-of-stream, so waiters can
+    # react to the sink draining instead of polling the buffer
+    drained = pyqtSignal()
+
     def __init__(self):
         super().__init__()
-        self.audio_buffer = bytearray()
-        self.mutex = QMutex()
-        self.end_of_stream = False
-        self.last_read_empty = False
-        self.is_active = False
+        self.front: bytearray = bytearray()  # Filled by writeData
+        self.back: bytearray = bytearray()  # Drained by readData
+        self.read_offset: int = 0  # Position inside the back buffer, owned by the reader
+        self.bytes_written: int = 0  # Only advanced by the writer
+        self.bytes_read: int = 0  # Only advanced under the mutex
+        self.swap_lock: threading.Lock = threading.Lock()
+        self.mutex: QMutex = QMutex()
+        # An Event so the reader can check it without taking the mutex
+        self.end_of_stream: threading.Event = threading.Event()
+        self.last_read_empty: bool = False
+        self.is_active: bool = False
+        # Reused for underruns; the sink asks for the same period size each time
+        self.silence: bytes = bytes(SINK_BUFFER_SIZE)
 
     def open(self, mode):
         success = super().open(mode)
@@ -38,53 +81,86 @@ class QueueAudioDevice(QIODevice):
     def seek(self, pos):
         return False
 
+    def buffered_bytes(self) -> int:
+        """Number of queued bytes not yet consumed by the audio sink"""
+        return self.bytes_written - self.bytes_read
+
     def readData(self, maxSize: int) -> bytes:
+        # Underruns are answered from the lock-free counters so an idle sink
+        # never holds the mutex that stop/clear requests need
+        if not self.buffered_bytes():
+            if self.end_of_stream.is_set():
+                logger.debug("[QueueAudioDevice] Buffer empty and end-of-stream marked")
+                self.drained.emit()
+                return bytes()
+            if len(self.silence) != maxSize:
+                self.silence = bytes(maxSize)
+            return self.silence
         with QMutexLocker(self.mutex):
-            if not self.audio_buffer:
-                if self.end_of_stream:
-                    logger.debug("[QueueAudioDevice] Buffer empty and end-of-stream marked")
-                    return bytes()
+            if self.read_offset >= len(self.back):
+                self._swap_buffers()
+            available = len(self.back) - self.read_offset
+            if not available:
+                # Buffers were dropped by a concurrent clear
                 return bytes(maxSize)
-            data = bytes(self.audio_buffer[:maxSize])
-            self.audio_buffer = self.audio_buffer[maxSize:]
+            end = self.read_offset + min(available, maxSize)
+            with memoryview(self.back) as view:
+                data = view[self.read_offset:end].tobytes()
+            self.read_offset = end
+            self.bytes_read += len(data)
             return data
 
     def writeData(self, data: bytes) -> int:
-        with QMutexLocker(self.mutex):
-            self.audio_buffer.extend(data)
-            return len(data)
+        with self.swap_lock:
+            self.front.extend(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+    def _swap_buffers(self) -> None:
+        """Recycle the drained back buffer as the new front; must be called with the mutex held"""
+        with self.swap_lock:
+            self.back.clear()
+            self.read_offset = 0
+            self.front, self.back = self.back, self.front
 
     def bytesAvailable(self) -> int:
-        with QMutexLocker(self.mutex):
-            return len(self.audio_buffer) + super().bytesAvailable()
+        return self.buffered_bytes() + super().bytesAvailable()
 
     def isSequential(self) -> bool:
         return True
 
-    def mark_end_of_stream(self):
-        with QMutexLocker(self.mutex):
-            logger.info(f"[QueueAudioDevice] Marking end of stream, current buffer size: {len(self.audio_buffer)}")
-            self.end_of_stream = True
-            if len(self.audio_buffer) == 0:
-                self.last_read_empty = True
-                logger.info("[QueueAudioDevice] Buffer empty at end-of-stream mark")
+    def mark_end_of_stream(self) -> None:
+        logger.info(f"[QueueAudioDevice] Marking end of stream, current buffer size: {self.buffered_bytes()}")
+        self.end_of_stream.set()
+        if self.buffered_bytes() == 0:
+            self.last_read_empty = True
+            logger.info("[QueueAudioDevice] Buffer empty at end-of-stream mark")
+            self.drained.emit()
+
+    def _drop_buffers(self) -> None:
+        """Discard all queued audio; must be called with the mutex held"""
+        with self.swap_lock:
+            self.bytes_read += len(self.back) - self.read_offset + len(self.front)
+            self.back.clear()
+            self.front.clear()
+            self.read_offset = 0
 
-    def clear_buffer(self):
+    def clear_buffer(self) -> None:
         with QMutexLocker(self.mutex):
-            self.audio_buffer.clear()
-            self.end_of_stream = False
+            self._drop_buffers()
+            self.end_of_stream.clear()
             self.last_read_empty = False
             logger.info("[QueueAudioDevice] Audio buffer cleared and state reset")
 
-    def reset_end_of_stream(self):
-        with QMutexLocker(self.mutex):
-            self.end_of_stream = False
-            self.last_read_empty = False
+    def reset_end_of_stream(self) -> None:
+        self.end_of_stream.clear()
+        self.last_read_empty = False
 
-    def clear_and_mark_end(self):
+    def clear_and_mark_end(self) -> None:
         with QMutexLocker(self.mutex):
-            self.audio_buffer.clear()
-            self.end_of_stream = True
+            self._drop_buffers()
+            self.end_of_stream.set()
+        self.drained.emit()
 
 # -----------------------------------------------------------------------------
 #                             AUDIO MANAGER CLASS
@@ -102,16 +178,26 @@ class AudioManager(QObject):
         self.audio_sink, self.audio_device = self._setup_audio()
         self.audio_sink.stateChanged.connect(self.audio_state_changed)
         self.audio_queue = asyncio.Queue()
+        # Set from the device's drained signal, delivered on the event loop thread
+        self.drained_event = asyncio.Event()
+        self.audio_device.drained.connect(self.drained_event.set)
+        # Set whenever the sink reaches StoppedState, so waiters need not poll it
+        self.sink_stopped_event = asyncio.Event()
+        self.audio_sink.stateChanged.connect(self._on_sink_state_changed)
         self.tts_audio_playing = False
         self.audio_consumer_task = None
         logger.info("AudioManager initialized")
         
+    def _on_sink_state_changed(self, state):
+        if state == QAudio.State.StoppedState:
+            self.sink_stopped_event.set()
+
     def _setup_audio(self):
         """Set up the audio output device and format"""
         audio_format = QAudioFormat()
-        audio_format.setSampleRate(24000)
-        audio_format.setChannelCount(1)
-        audio_format.setSampleFormat(QAudioFormat.SampleFormat.Int16)
+        audio_format.setSampleRate(PLAYBACK_CONFIG['sample_rate'])
+        audio_format.setChannelCount(PLAYBACK_CONFIG['channels'])
+        audio_format.setSampleFormat(PLAYBACK_SAMPLE_FORMAT)
 
         device = QMediaDevices.defaultAudioOutput()
         if device is None:
@@ -121,6 +207,7 @@ class AudioManager(QObject):
 
         audio_sink = QAudioSink(device, audio_format)
         audio_sink.setVolume(1.0)
+        audio_sink.setBufferSize(SINK_BUFFER_SIZE)
         logger.info(f"Audio sink created with initial state: {audio_sink.state()}")
 
         audio_device = QueueAudioDevice()
@@ -143,15 +230,19 @@ class AudioManager(QObject):
                 pcm_chunk = await self.audio_queue.get()
                 if pcm_chunk is None:
                     logger.info("[audio_consumer] Received end-of-stream marker.")
-                    await asyncio.to_thread(self.audio_device.mark_end_of_stream)
-                    while True:
-                        buffer_len = await asyncio.to_thread(lambda: len(self.audio_device.audio_buffer))
-                        if buffer_len == 0:
-                            logger.info("[audio_consumer] Audio buffer is empty, stopping sink.")
-                            self.audio_sink.stop()
-                            break
-                        await asyncio.sleep(0.05)
-                    await asyncio.to_thread(self.audio_device.reset_end_of_stream)
+                    self.drained_event.clear()
+                    self.audio_device.mark_end_of_stream()
+                    # Sleep until the device reports it has drained; the timeout
+                    # only guards against a sink that stopped pulling data
+                    while self.audio_device.buffered_bytes():
+                        try:
+                            await asyncio.wait_for(self.drained_event.wait(), timeout=1.0)
+                        except asyncio.TimeoutError:
+                            pass
+                        self.drained_event.clear()
+                    logger.info("[audio_consumer] Audio buffer is empty, stopping sink.")
+                    self.audio_sink.stop()
+                    self.audio_device.reset_end_of_stream()
                     continue
 
                 if self.audio_sink.state() != QAudio.State.ActiveState:
@@ -160,8 +251,10 @@ class AudioManager(QObject):
                     self.audio_device.open(QIODevice.OpenModeFlag.ReadOnly)
                     self.audio_sink.start(self.audio_device)
 
-                bytes_written = await asyncio.to_thread(self.audio_device.writeData, pcm_chunk)
-                logger.debug(f"[audio_consumer] Wrote {bytes_written} bytes to device.")
+                # writeData only appends to the device's chunk queue, so it is
+                # cheap enough to call inline instead of hopping to a worker thread
+                bytes_written = self.audio_device.writeData(pcm_chunk)
+                logger.debug("[audio_consumer] Wrote %d bytes to device.", bytes_written)
                 await asyncio.sleep(0)
             
             except Exception as e:
@@ -176,10 +269,10 @@ class AudioManager(QObject):
             pcm_data: The audio data received
             stt_handler: Optional callback to handle STT pausing/resuming
         """
-        logger.info(f"Received audio chunk of size: {len(pcm_data)} bytes")
+        logger.debug("Received audio chunk of size: %d bytes", len(pcm_data))
         
         # Handle empty audio message (end of stream)
-        if pcm_data == b'audio:' or len(pcm_data) == 0:
+        if len(pcm_data) <= len(AUDIO_MESSAGE_TAG):
             logger.info("Received empty audio message, marking end-of-stream")
             self.audio_queue.put_nowait(None)
             self.audio_device.mark_end_of_stream()
@@ -196,18 +289,18 @@ class AudioManager(QObject):
                     logger.info("Pausing STT using KeepAlive mechanism due to TTS audio starting")
                     stt_handler.set_paused(True)
                     
-            # Process the audio data
-            prefix = b'audio:'
-            if pcm_data.startswith(prefix):
-                pcm_data = pcm_data[len(prefix):]
-            self.audio_queue.put_nowait(pcm_data)
+            # The network layer only forwards tagged audio frames; strip the
+            # tag through a memoryview so the payload is not copied before it
+            # reaches the device
+            self.audio_queue.put_nowait(memoryview(pcm_data)[len(AUDIO_MESSAGE_TAG):])
     
     async def resume_stt_after_tts(self, stt_handler):
         """Wait for TTS audio to finish playing before resuming STT"""
         logger.info("Waiting for TTS audio to finish playing to resume STT...")
         # Wait until the audio sink is stopped (i.e. TTS audio finished playing)
-        while self.audio_sink.state() != QAudio.State.StoppedState:
-            await asyncio.sleep(0.1)
+        if self.audio_sink.state() != QAudio.State.StoppedState:
+            self.sink_stopped_event.clear()
+            await self.sink_stopped_event.wait()
         if stt_handler.is_enabled:
             logger.info("Resuming STT after TTS finished playing")
             # Give some time for the audio system to fully settle
@@ -242,8 +335,8 @@ class AudioManager(QObject):
             # Still force a state update to ensure UI responds
             self.audio_state_changed.emit(current_state)
 
-        # Clear device buffer efficiently
-        await asyncio.to_thread(self.audio_device.clear_and_mark_end)
+        # Clear device buffer; this only swaps buffers under a short lock
+        self.audio_device.clear_and_mark_end()
         
         # Clear the audio queue efficiently using a direct approach
         try:
@@ -259,8 +352,7 @@ class AudioManager(QObject):
     
     def get_audio_state(self):
         """Get the current state of the audio buffer and end-of-stream flag"""
-        with QMutexLocker(self.audio_device.mutex):
-            return len(self.audio_device.audio_buffer), self.audio_device.end_of_stream
+        return self.audio_device.buffered_bytes(), self.audio_device.end_of_stream.is_set()
     
     def cleanup(self):
         """Clean up audio resources completely and release all resources"""
@@ -10,6 +10,22 @@ SERVER_PORT = 8000
 WEBSOCKET_PATH = "/ws/chat"
 HTTP_BASE_URL = f"http://{SERVER_HOST}:{SERVER_PORT}"
 
+# Binary websocket frames start with a one-byte type tag; must match the
+# backend's AUDIO_MESSAGE_PREFIX. A bare tag marks end of audio.
+AUDIO_MESSAGE_TAG = b'\x01'
+
+# -----------------------------------------------------------------------------
+#                           PLAYBACK CONFIGURATION
+# -----------------------------------------------------------------------------
+
+PLAYBACK_CONFIG = {
+    'sample_rate': 24000,
+    'channels': 1,
+    'sample_width': 2,  # Bytes per sample (Int16)
+    'latency_ms': 40,  # Target audio sink buffer latency
+    'min_frames_per_buffer': 512,
+}
+
 # -----------------------------------------------------------------------------
 #                           LOGGING CONFIGURATION
 # -----------------------------------------------------------------------------
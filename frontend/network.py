@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 import json
 import asyncio
+import orjson
 import aiohttp
 import websockets
 from PyQt6.QtCore import QObject, pyqtSignal
-from frontend.config import SERVER_HOST, SERVER_PORT, WEBSOCKET_PATH, HTTP_BASE_URL, logger
+from frontend.config import SERVER_HOST, SERVER_PORT, WEBSOCKET_PATH, HTTP_BASE_URL, AUDIO_MESSAGE_TAG, logger
 from frontend.stt.config import STT_CONFIG
 import concurrent.futures
 
@@ -110,8 +111,9 @@ class AsyncWebSocketClient(QObject):
             
         # Handle text messages
         try:
-            data = json.loads(message)
-            logger.debug(f"Received message: {data}")
+            # Every streamed content batch is decoded here, so use orjson
+            data = orjson.loads(message)
+            logger.debug("Received message: %s", data)
             
             # Dispatch to appropriate handler based on message type
             msg_type = data.get("type")
@@ -121,36 +123,35 @@ class AsyncWebSocketClient(QObject):
                 self.message_received.emit(data["content"])
             else:
                 logger.warning(f"Unknown message type: {data}")
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error("Failed to parse JSON message")
             logger.error(f"Raw message: {message}")
     
     def _process_binary_message(self, message):
         """Process binary messages (typically audio data)"""
-        if message.startswith(b'audio:'):
-            audio_data = message[len(b'audio:'):]
-            logger.debug(f"Received audio chunk of size: {len(audio_data)} bytes")
+        # Dispatch on the one-byte type tag
+        if message[:1] == AUDIO_MESSAGE_TAG:
+            logger.debug("Received audio chunk of size: %d bytes", len(message) - 1)
             self.audio_received.emit(message)
         else:
-            logger.warning("Received binary message without audio prefix")
-            self.audio_received.emit(b'audio:' + message)
+            logger.warning("Received binary message with unknown type tag, dropping it")
     
     def _handle_stt_message(self, data):
         """Handle speech-to-text messages"""
         stt_text = data.get("stt_text", "")
-        logger.debug(f"Processing STT text immediately: {stt_text}")
+        logger.debug("Processing STT text immediately: %s", stt_text)
         self.stt_text_received.emit(stt_text)
     
     def _handle_stt_state_message(self, data):
         """Handle speech-to-text state updates"""
         is_listening = data.get("is_listening", False)
-        logger.debug(f"Updating STT state: listening = {is_listening}")
+        logger.debug("Updating STT state: listening = %s", is_listening)
         self.stt_state_received.emit(is_listening)
     
     def _handle_tts_state_message(self, data):
         """Handle text-to-speech state updates"""
         is_enabled = data.get("tts_enabled", False)
-        logger.debug(f"Updating TTS state: enabled = {is_enabled}")
+        logger.debug("Updating TTS state: enabled = %s", is_enabled)
         self.tts_state_changed.emit(is_enabled)
         
     def _handle_context_reset_message(self, data):
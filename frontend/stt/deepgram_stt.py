@@ -42,6 +42,8 @@ class DeepgramSTT(QObject):
         self.keepalive_timeout = DEEPGRAM_CONFIG.get('keepalive', {}).get('timeout', 10)  # seconds
         self.last_activity_time = time.time()
         self.timeout_timer = None
+        # Wakes the keepalive check on the Deepgram loop when STT resumes
+        self._keepalive_wakeup = asyncio.Event()
 
         # Create a dedicated event loop for Deepgram tasks and run it in a separate thread.
         self.dg_loop = asyncio.new_event_loop()
@@ -109,17 +111,20 @@ class DeepgramSTT(QObject):
                 # We'll consider two conditions for activity:
                 # 1. There's an actual transcript with content
                 # 2. There's a speech_started event that's explicitly true
-                has_speech_content = transcript and transcript.strip()
-                is_speech_starting = hasattr(result, 'speech_started') and result.speech_started
+                # isspace() answers the same question as strip() without
+                # allocating a copy of every interim transcript
+                has_speech_content = bool(transcript) and not transcript.isspace()
+                is_speech_starting = getattr(result, 'speech_started', False)
                 
                 if has_speech_content or is_speech_starting:
                     self._reset_activity_timer()
                     
                     # Log the reason for the reset
                     if has_speech_content:
-                        # Fix the string formatting
-                        transcript_preview = transcript[:20] + "..." if len(transcript) > 20 else transcript
-                        logging.info(f"Activity timer reset due to speech content: '{transcript_preview}'")
+                        # The preview is only sliced when INFO logging is on
+                        if logging.getLogger().isEnabledFor(logging.INFO):
+                            transcript_preview = transcript[:20] + "..." if len(transcript) > 20 else transcript
+                            logging.info("Activity timer reset due to speech content: '%s'", transcript_preview)
                     elif is_speech_starting:
                         logging.info("Activity timer reset due to speech_started event")
                 
@@ -139,9 +144,9 @@ class DeepgramSTT(QObject):
                         self.is_finals.append(transcript)
                         
                 # Log speech events if available
-                if hasattr(result, 'speech_final') and result.speech_final:
+                if getattr(result, 'speech_final', False):
                     logging.info("[SPEECH EVENT] Speech segment ended")
-                elif hasattr(result, 'speech_started') and result.speech_started:
+                elif is_speech_starting:
                     logging.info("[SPEECH EVENT] Speech segment started")
                     
             except Exception as e:
@@ -276,11 +281,10 @@ class DeepgramSTT(QObject):
             logging.warning("Cannot restart listening because STT is disabled")
             return False
             
-        # If STT is paused, just unpause it
+        # If STT is paused, just unpause it; the resume emits the listening state
         if self.is_paused:
             logging.info("STT is paused, resuming")
             self.set_paused(False)
-            self.state_changed.emit(True)  # Ensure UI updates
             return True
         
         # If we have a connection but no microphone, try to restart just the microphone
@@ -315,13 +319,10 @@ class DeepgramSTT(QObject):
             # Small delay to ensure clean restart
             time.sleep(0.2)
             
-            # Start a new connection
+            # Start a new connection; the disable above cleared is_enabled, so
+            # this always emits the enabled and listening signals exactly once
             result = self.handle_audio_state('enable')
             
-            # Force emit state signals to ensure UI updates
-            self.enabled_changed.emit(True)
-            self.state_changed.emit(True)
-            
             logging.info(f"Full STT restart {'successful' if result else 'failed'}")
             return result
             
@@ -345,7 +346,7 @@ class DeepgramSTT(QObject):
         Returns:
             bool: The new state (True for enabled/listening, False for disabled/not listening)
         """
-        logging.debug(f"Audio state action: {action}")
+        logging.debug("Audio state action: %s", action)
         
         if action == 'enable':
             if self.is_enabled:
@@ -413,6 +414,7 @@ class DeepgramSTT(QObject):
                 return self.is_enabled  # Can't resume if not enabled or not paused
                 
             self.is_paused = False
+            self.dg_loop.call_soon_threadsafe(self._keepalive_wakeup.set)
             if should_emit_signals:
                 self.state_changed.emit(True)  # Actively listening when resumed
                 
@@ -516,7 +518,7 @@ class DeepgramSTT(QObject):
         # This prevents constant updates from Deepgram events
         if (current_time - self.last_activity_time) > 0.5:
             self.last_activity_time = current_time
-            logging.info(f"Activity timer reset - will timeout in {self.keepalive_timeout} seconds if no speech detected")
+            logging.info("Activity timer reset - will timeout in %s seconds if no speech detected", self.keepalive_timeout)
         # Otherwise, silently ignore the reset
 
     def _start_keepalive_timer(self):
@@ -537,53 +539,42 @@ class DeepgramSTT(QObject):
     async def _check_keepalive_timeout(self):
         """Check for inactivity and turn off STT if keepalive threshold is exceeded"""
         try:
-            logging.info(f"Starting keepalive check loop with timeout of {self.keepalive_timeout} seconds")
-            check_interval = 0.5  # Check more frequently (twice per second)
-            last_log_time = 0
+            logging.info("Starting keepalive check loop with timeout of %s seconds", self.keepalive_timeout)
             was_paused = False  # Track previous paused state for transitions
             
             while self.is_enabled:
-                # Check for transitions from paused to unpaused
-                if was_paused and not self.is_paused:
+                # Don't count down while paused (e.g. during TTS playback); sleep
+                # until a resume wakes us instead of checking on a fixed interval
+                if self.is_paused:
+                    was_paused = True
+                    self._keepalive_wakeup.clear()
+                    if self.is_paused:
+                        logging.debug("Keepalive timer paused while system is in pause state (e.g., during TTS playback)")
+                        await self._keepalive_wakeup.wait()
+                    continue
+                
+                if was_paused:
                     # We just transitioned from paused to unpaused, reset timer
+                    was_paused = False
                     self.last_activity_time = time.time()
-                    logging.info(f"Paused→Unpaused transition detected - reset activity timer (timeout in {self.keepalive_timeout} seconds)")
-                
-                # Update tracking of paused state
-                was_paused = self.is_paused
+                    logging.info("Paused→Unpaused transition detected - reset activity timer (timeout in %s seconds)", self.keepalive_timeout)
                 
-                # Only check for timeout if not paused - don't count down when TTS is playing
-                if not self.is_paused:
-                    # Check if we've exceeded the keepalive timeout
-                    current_time = time.time()
-                    time_since_last_activity = current_time - self.last_activity_time
-                    
-                    # Log progress at most once every 5 seconds to avoid log spam
-                    if current_time - last_log_time >= 5:
-                        logging.info(f"Keepalive timer: {time_since_last_activity:.1f}/{self.keepalive_timeout} seconds passed")
-                        last_log_time = current_time
-                    
-                    # Use a very strict comparison to ensure we timeout exactly on time
-                    if time_since_last_activity >= self.keepalive_timeout:
-                        logging.info(f"TIMEOUT REACHED: No activity detected for {time_since_last_activity:.1f} seconds (threshold: {self.keepalive_timeout})")
-                        # Directly disable rather than scheduling it to ensure immediate action
-                        self.is_enabled = False  # Set flag immediately for other check loops
-                        await self._disable_on_timeout()
-                        break
-                else:
-                    # If we're paused, just log less frequently to confirm we're not counting down
-                    current_time = time.time()
-                    if current_time - last_log_time >= 10:  # Log less frequently when paused
-                        logging.debug("Keepalive timer paused while system is in pause state (e.g., during TTS playback)")
-                        last_log_time = current_time
+                time_since_last_activity = time.time() - self.last_activity_time
+                if time_since_last_activity >= self.keepalive_timeout:
+                    logging.info("TIMEOUT REACHED: No activity detected for %.1f seconds (threshold: %s)", time_since_last_activity, self.keepalive_timeout)
+                    # Directly disable rather than scheduling it to ensure immediate action
+                    self.is_enabled = False  # Set flag immediately for other check loops
+                    await self._disable_on_timeout()
+                    break
                 
-                # Sleep for a short time to avoid high CPU usage
-                await asyncio.sleep(check_interval)
+                # Sleep until the current deadline; activity in the meantime only
+                # moves the deadline later, which is picked up on the next pass
+                await asyncio.sleep(self.keepalive_timeout - time_since_last_activity)
         except asyncio.CancelledError:
             # This is expected if the timer is cancelled
             logging.debug("Keepalive check task cancelled")
         except Exception as e:
-            logging.error(f"Error in keepalive check: {e}")
+            logging.error("Error in keepalive check: %s", e)
             
     async def _disable_on_timeout(self):
         """Disable STT due to timeout - separated to ensure clean execution"""
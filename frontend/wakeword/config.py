@@ -30,6 +30,9 @@ WAKEWORD_CONFIG = {
     'sample_rate': 16000,
     'audio_device_index': None,  # None = default device
     
+    # Use PyAudio callback mode instead of a blocking read thread
+    'use_callback': False,
+    
     # Cooldown period between wake word detections (in seconds)
     'cooldown_period': 3.0,
     
@@ -18,6 +18,26 @@ from frontend.config import logger
 from frontend.wakeword.config import WAKEWORD_CONFIG
 from frontend.wakeword.custom_porcupine import create as create_porcupine
 
+# PyAudio instance shared by every detector start/stop cycle
+_pyaudio_instance = None
+
+def get_pyaudio():
+    """Return the shared PyAudio instance, initializing PortAudio on first use"""
+    global _pyaudio_instance
+    if _pyaudio_instance is None:
+        _pyaudio_instance = pyaudio.PyAudio()
+    return _pyaudio_instance
+
+def terminate_pyaudio():
+    """Terminate the shared PyAudio instance if one was created, without creating it"""
+    global _pyaudio_instance
+    if _pyaudio_instance is not None:
+        try:
+            _pyaudio_instance.terminate()
+        except Exception as e:
+            logger.error(f"Error terminating PyAudio: {e}")
+        _pyaudio_instance = None
+
 class WakeWordDetector(QObject):
     """
     Wake word detector that listens for specific wake words and triggers actions
@@ -34,6 +54,7 @@ class WakeWordDetector(QObject):
         self.audio_device_index = WAKEWORD_CONFIG.get('audio_device_index')
         self.cooldown_period = WAKEWORD_CONFIG.get('cooldown_period', 3.0)
         self.auto_start = WAKEWORD_CONFIG.get('auto_start', True)
+        self.use_callback = WAKEWORD_CONFIG.get('use_callback', False)
         
         # Initialize attributes
         self.porcupine = None
@@ -44,6 +65,7 @@ class WakeWordDetector(QObject):
         
         # Wake word names, derived from model filenames
         # Extract file stem and take everything before the first underscore, preserving hyphens
+        # Names are lowercased here so listeners can match them without normalizing
         self.wake_words = []
         for path in self.model_paths:
             stem = Path(path).stem
@@ -51,7 +73,7 @@ class WakeWordDetector(QObject):
                 word = stem.split('_')[0]
             else:
                 word = stem
-            self.wake_words.append(word)
+            self.wake_words.append(word.lower())
         
         logger.info(f"Initialized wake words: {self.wake_words}")
         
@@ -78,28 +100,31 @@ class WakeWordDetector(QObject):
                 sensitivities=[self.sensitivity] * len(self.model_paths)
             )
             
-            # Initialize PyAudio
-            self.pa = pyaudio.PyAudio()
+            # Reuse the shared PyAudio instance instead of re-initializing PortAudio
+            self.pa = get_pyaudio()
+            
+            # Reset stop event
+            self.stop_event.clear()
             
-            # Open audio stream
+            # Open audio stream; in callback mode PortAudio delivers each frame
+            # to _pa_callback and no detection thread is needed
             self.audio_stream = self.pa.open(
                 rate=self.porcupine.sample_rate,
                 channels=1,
                 format=pyaudio.paInt16,
                 input=True,
                 frames_per_buffer=self.porcupine.frame_length,
-                input_device_index=self.audio_device_index
+                input_device_index=self.audio_device_index,
+                stream_callback=self._pa_callback if self.use_callback else None
             )
             
-            # Reset stop event
-            self.stop_event.clear()
-            
-            # Start detection thread
-            self.detection_thread = threading.Thread(
-                target=self._detection_loop,
-                daemon=True
-            )
-            self.detection_thread.start()
+            if not self.use_callback:
+                # Start detection thread
+                self.detection_thread = threading.Thread(
+                    target=self._detection_loop,
+                    daemon=True
+                )
+                self.detection_thread.start()
             
             self.is_running = True
             logger.info("Wake word detection started successfully")
@@ -137,12 +162,8 @@ class WakeWordDetector(QObject):
                 logger.error(f"Error closing audio stream: {e}")
             self.audio_stream = None
             
-        if self.pa:
-            try:
-                self.pa.terminate()
-            except Exception as e:
-                logger.error(f"Error terminating PyAudio: {e}")
-            self.pa = None
+        # The PyAudio instance is shared, so only drop our reference to it
+        self.pa = None
             
         if self.porcupine:
             try:
@@ -159,32 +180,45 @@ class WakeWordDetector(QObject):
             self.start()
         return self.is_running
     
+    def _process_frame(self, pcm_bytes):
+        """Run wake word detection on one frame of 16-bit PCM"""
+        pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm_bytes)
+        
+        # Process audio for wake word detection
+        keyword_index = self.porcupine.process(pcm)
+        
+        # If a wake word is detected
+        if keyword_index >= 0 and keyword_index < len(self.wake_words):
+            current_time = time.time()
+            # Check cooldown period
+            if current_time - self.last_detection_time > self.cooldown_period:
+                self.last_detection_time = current_time
+                wake_word = self.wake_words[keyword_index]
+                logger.info(f"Wake word detected: {wake_word}")
+                # Emit signal with detected wake word
+                self.wake_word_detected.emit(wake_word)
+
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio stream callback used when use_callback is enabled"""
+        if self.stop_event.is_set():
+            return None, pyaudio.paComplete
+        try:
+            self._process_frame(in_data)
+        except Exception as e:
+            logger.error(f"Error in wake word detection callback: {e}")
+            return None, pyaudio.paAbort
+        return None, pyaudio.paContinue
+    
     def _detection_loop(self):
         """Main detection loop that runs in a separate thread"""
         logger.info("Wake word detection loop started")
         
         try:
             while not self.stop_event.is_set():
-                # Read audio frame
+                # read() blocks until a full frame is available, so the loop is
+                # paced by the microphone and needs no extra sleep
                 pcm_bytes = self.audio_stream.read(self.porcupine.frame_length, exception_on_overflow=False)
-                pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm_bytes)
-                
-                # Process audio for wake word detection
-                keyword_index = self.porcupine.process(pcm)
-                
-                # If a wake word is detected
-                if keyword_index >= 0 and keyword_index < len(self.wake_words):
-                    current_time = time.time()
-                    # Check cooldown period
-                    if current_time - self.last_detection_time > self.cooldown_period:
-                        self.last_detection_time = current_time
-                        wake_word = self.wake_words[keyword_index]
-                        logger.info(f"Wake word detected: {wake_word}")
-                        # Emit signal with detected wake word
-                        self.wake_word_detected.emit(wake_word)
-                
-                # Small sleep to reduce CPU usage
-                time.sleep(0.01)
+                self._process_frame(pcm_bytes)
                 
         except Exception as e:
             logger.error(f"Error in wake word detection loop: {e}")
@@ -9,7 +9,7 @@ from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
 from frontend.config import logger
 from frontend.wakeword.config import WAKEWORD_CONFIG
-from frontend.wakeword.detector import WakeWordDetector
+from frontend.wakeword.detector import WakeWordDetector, terminate_pyaudio
 
 class WakeWordManager(QObject):
     """
@@ -41,6 +41,13 @@ class WakeWordManager(QObject):
             except Exception as e:
                 logger.error(f"Error loading wake sound: {e}")
         
+        # Wake word handlers keyed by the detector's lowercase names, resolved once here
+        self.wake_word_handlers = {
+            "computer": self._handle_activate_wake_word,
+            "stop-there": self._handle_stop_wake_word,
+            "stop": self._handle_stop_wake_word,  # Handle both formats in case of filename parsing issues
+        }
+        
         # Connect signals
         self.detector.wake_word_detected.connect(self._on_wake_word_detected)
         
@@ -92,81 +99,87 @@ class WakeWordManager(QObject):
         
         # Activate STT if chat controller is available
         if self.chat_controller:
-            # Handle different wake words
-            if wake_word.lower() == "computer":
-                # Play wake sound for "computer" wake word only
-                if self.wake_sound_data:
-                    logger.info(f"Playing wake sound for '{wake_word}'")
-                    self.play_wake_sound()
-                
-                # Only activate STT if it's not already active
-                if not self.chat_controller.frontend_stt.is_enabled:
-                    logger.info("Activating STT based on wake word detection")
-                    self.chat_controller.toggle_stt()
-                    
-                    # Also enable auto-send mode
-                    if not self.chat_controller.auto_send_enabled:
-                        logger.info("Enabling auto-send based on wake word detection")
-                        self.chat_controller.auto_send_enabled = True
-                        self.chat_controller.auto_send_state_changed.emit(True)
-                else:
-                    logger.info("STT is already active, ignoring wake word")
-            elif wake_word.lower() in ["stop-there", "stop"]:  # Handle both formats in case of filename parsing issues
-                # Stop TTS and text generation (no sound played)
-                # This acts like the stop button without turning off STT
-                logger.info("Stopping TTS and generation based on wake word without disabling STT")
-                
-                # Create a more robust handling of the stop action with a timeout
-                async def stop_with_timeout():
-                    try:
-                        # Set a timeout to avoid hanging if something goes wrong
-                        await asyncio.wait_for(
-                            self.chat_controller.stop_tts_and_generation_async(),
-                            timeout=5.0
-                        )
-                        logger.info("Stop operation successfully completed")
-                        
-                        # Important: After stopping is complete, ensure STT is actively listening
-                        # Wait a short moment to let things settle
-                        await asyncio.sleep(0.5)
-                        
-                        # If STT is enabled but not listening, restart it
-                        if (self.chat_controller.stt_enabled and 
-                            hasattr(self.chat_controller, 'frontend_stt') and 
-                            not self.chat_controller.stt_listening):
-                            logger.info("Re-activating STT listening after stop")
-                            self.chat_controller.frontend_stt.restart_listening()
-                    except asyncio.TimeoutError:
-                        logger.warning("Stop operation timed out, forcing audio stop")
-                        # Force a direct audio stop if the main stop times out
-                        if self.chat_controller and self.chat_controller.audio_manager:
-                            await self.chat_controller.audio_manager.stop_audio()
-                            # Still try to restart listening
-                            if (self.chat_controller.stt_enabled and
-                                hasattr(self.chat_controller, 'frontend_stt')):
-                                logger.info("Re-activating STT listening after timeout")
-                                self.chat_controller.frontend_stt.restart_listening()
-                    except Exception as e:
-                        logger.error(f"Error during stop operation: {e}")
-                        # Still try to reset audio state on error
-                        if self.chat_controller and self.chat_controller.audio_manager:
-                            await self.chat_controller.audio_manager.stop_audio()
-                            # Try to restart listening even after error
-                            if (self.chat_controller.stt_enabled and
-                                hasattr(self.chat_controller, 'frontend_stt')):
-                                logger.info("Re-activating STT listening after error")
-                                self.chat_controller.frontend_stt.restart_listening()
-                
-                # Launch the robust stop handler
-                asyncio.create_task(stop_with_timeout())
+            handler = self.wake_word_handlers.get(wake_word)
+            if handler:
+                handler(wake_word)
             else:
                 logger.warning("Unknown wake word, can't activate STT")
         else:
             logger.warning("Chat controller not set, can't activate STT on wake word")
+
+    def _handle_activate_wake_word(self, wake_word):
+        """Play the wake sound and turn on STT with auto-send"""
+        # Play wake sound for "computer" wake word only
+        if self.wake_sound_data:
+            logger.info(f"Playing wake sound for '{wake_word}'")
+            self.play_wake_sound()
+        
+        # Only activate STT if it's not already active
+        if not self.chat_controller.frontend_stt.is_enabled:
+            logger.info("Activating STT based on wake word detection")
+            self.chat_controller.toggle_stt()
+            
+            # Also enable auto-send mode
+            if not self.chat_controller.auto_send_enabled:
+                logger.info("Enabling auto-send based on wake word detection")
+                self.chat_controller.auto_send_enabled = True
+                self.chat_controller.auto_send_state_changed.emit(True)
+        else:
+            logger.info("STT is already active, ignoring wake word")
+
+    def _handle_stop_wake_word(self, wake_word):
+        """Stop TTS and text generation (no sound played)"""
+        # This acts like the stop button without turning off STT
+        logger.info("Stopping TTS and generation based on wake word without disabling STT")
+        
+        # Launch the robust stop handler
+        asyncio.create_task(self._stop_with_timeout())
     
+    async def _stop_with_timeout(self):
+        """Stop TTS and generation with a timeout, then make sure STT is listening again"""
+        try:
+            # Set a timeout to avoid hanging if something goes wrong
+            await asyncio.wait_for(
+                self.chat_controller.stop_tts_and_generation_async(),
+                timeout=5.0
+            )
+            logger.info("Stop operation successfully completed")
+
+            # Important: After stopping is complete, ensure STT is actively listening
+            # Wait a short moment to let things settle
+            await asyncio.sleep(0.5)
+
+            # If STT is enabled but not listening, restart it
+            if (self.chat_controller.stt_enabled and 
+                hasattr(self.chat_controller, 'frontend_stt') and 
+                not self.chat_controller.stt_listening):
+                logger.info("Re-activating STT listening after stop")
+                self.chat_controller.frontend_stt.restart_listening()
+        except asyncio.TimeoutError:
+            logger.warning("Stop operation timed out, forcing audio stop")
+            # Force a direct audio stop if the main stop times out
+            if self.chat_controller and self.chat_controller.audio_manager:
+                await self.chat_controller.audio_manager.stop_audio()
+                # Still try to restart listening
+                if (self.chat_controller.stt_enabled and
+                    hasattr(self.chat_controller, 'frontend_stt')):
+                    logger.info("Re-activating STT listening after timeout")
+                    self.chat_controller.frontend_stt.restart_listening()
+        except Exception as e:
+            logger.error(f"Error during stop operation: {e}")
+            # Still try to reset audio state on error
+            if self.chat_controller and self.chat_controller.audio_manager:
+                await self.chat_controller.audio_manager.stop_audio()
+                # Try to restart listening even after error
+                if (self.chat_controller.stt_enabled and
+                    hasattr(self.chat_controller, 'frontend_stt')):
+                    logger.info("Re-activating STT listening after error")
+                    self.chat_controller.frontend_stt.restart_listening()
+
     def cleanup(self):
         """Clean up resources"""
         self.stop()
+        terminate_pyaudio()
         
     def __del__(self):
         """Clean up on deletion"""
@@ -26,6 +26,16 @@ install_system_dependencies() {
     fi
 }
 
+# Function to make sure an interpreter is Python 3.11 or newer
+check_python_version() {
+    local python_bin=$1
+    
+    if ! "$python_bin" -c 'import sys; sys.exit(sys.version_info < (3, 11))' &> /dev/null; then
+        echo "ERROR: $python_bin is $("$python_bin" --version 2>&1); Python 3.11 or newer is required."
+        exit 1
+    fi
+}
+
 # Function to install packages directly into a virtual environment
 install_to_venv() {
     local venv_path=$1
@@ -150,6 +160,13 @@ else
     esac
 fi
 
+# The backend needs Python 3.11+, so check the interpreter before doing any work
+if [ "$CREATE_NEW_VENV" = true ]; then
+    check_python_version python3
+else
+    check_python_version "$VENV_PATH/bin/python"
+fi
+
 # Before installing packages, check and install system dependencies
 install_system_dependencies
 